@@ -2,11 +2,21 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections import OrderedDict, defaultdict
 from typing import TYPE_CHECKING
 
 import httpx
-
-from app.core.config import GEMINI_API_KEY, GEMINI_MODEL, GEMINI_TIMEOUT, FALLBACK_EXPLANATIONS
+import orjson
+
+from app.core.cache import build_backend
+from app.core.config import (
+    AI_CACHE_TTL_SECONDS,
+    FALLBACK_EXPLANATIONS,
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    GEMINI_TIMEOUT,
+)
 
 if TYPE_CHECKING:
     from app.core.engine import Alert
@@ -18,48 +28,103 @@ GEMINI_URL = (
     f"{GEMINI_MODEL}:generateContent?key={{api_key}}"
 )
 
-_cache: dict[str, str] = {}
+# Baked once at import so the hot path never re-formats the URL.
+_GEMINI_URL = GEMINI_URL.format(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else ""
+
+MAX_CACHE = 4096
+
+# Bounded LRU of (expiry, text): oldest entries are evicted once MAX_CACHE
+# is reached, and entries past AI_CACHE_TTL expire on read.
+_cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+# Coroutines requesting a key that is already being fetched await the same
+# Future instead of firing a duplicate Gemini call (thundering-herd guard).
+_inflight: dict[str, asyncio.Future[str]] = {}
+
+# Tier-2 cache shared across workers (Redis when configured, no-op otherwise).
+_backend = build_backend()
+
+
+def _cache_get(key: str) -> str | None:
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expiry, text = entry
+    if time.monotonic() >= expiry:
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return text
+
+
+def _cache_put(key: str, text: str) -> None:
+    _cache[key] = (time.monotonic() + AI_CACHE_TTL_SECONDS, text)
+    _cache.move_to_end(key)
+    while len(_cache) > MAX_CACHE:
+        _cache.popitem(last=False)
+
+
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Lazily create the shared Gemini client (one connection pool per process)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=GEMINI_TIMEOUT,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+    return _client
+
+
+async def aclose_client() -> None:
+    """Close the shared client; called from the app lifespan on shutdown."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+# Compiled once; per-alert builds are a single .format dispatch instead of
+# re-assembling the whole prompt from literals.
+_PROMPT_TMPL = (
+    "You are a behavioural finance coach helping Indian retail investors.\n\n"
+    "Alert Type : {alert_type}\n"
+    "Risk Score : {risk}/100\n"
+    "Trade      : {action} {quantity} shares of {symbol} @ ₹{price:.2f}\n\n"
+    "In 4 concise sentences:\n"
+    "1. Name the specific cognitive bias at play.\n"
+    "2. Explain why this behaviour is financially harmful.\n"
+    "3. Give one actionable, practical tip to avoid it next time.\n"
+    "4. Encourage the trader with empathy — avoid being preachy."
+)
 
 
 def _build_prompt(alert: "Alert") -> str:
     t = alert.trade
-    return (
-        f"You are a behavioural finance coach helping Indian retail investors.\n\n"
-        f"Alert Type : {alert.alert_type}\n"
-        f"Risk Score : {alert.emotional_risk_score}/100\n"
-        f"Trade      : {t.action} {t.quantity} shares of {t.symbol} @ ₹{t.price:.2f}\n\n"
-        f"In 4 concise sentences:\n"
-        f"1. Name the specific cognitive bias at play.\n"
-        f"2. Explain why this behaviour is financially harmful.\n"
-        f"3. Give one actionable, practical tip to avoid it next time.\n"
-        f"4. Encourage the trader with empathy — avoid being preachy."
+    return _PROMPT_TMPL.format(
+        alert_type=alert.alert_type,
+        risk=alert.emotional_risk_score,
+        action=t.action,
+        quantity=t.quantity,
+        symbol=t.symbol,
+        price=t.price,
     )
 
 
-async def get_ai_explanation(alert: "Alert") -> str:
-    """
-    Return an AI-generated explanation for the alert.
-    Uses in-memory cache keyed by (alert_type, symbol, risk_decile).
-    Falls back to static text if Gemini is not configured or errors out.
-    """
-    cached = _cache.get(alert.cache_key)
-    if cached:
-        return cached
-
-    if not GEMINI_API_KEY:
-        return FALLBACK_EXPLANATIONS.get(alert.alert_type, "No explanation available.")
-
+async def _fetch_explanation(alert: "Alert") -> str:
+    """Call Gemini for one alert; cache on success, fall back on any failure."""
     payload = {"contents": [{"parts": [{"text": _build_prompt(alert)}]}]}
-    url = GEMINI_URL.format(api_key=GEMINI_API_KEY)
 
     try:
-        async with httpx.AsyncClient(timeout=GEMINI_TIMEOUT) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            data = response.json()
-            text: str = data["candidates"][0]["content"]["parts"][0]["text"].strip()
-            _cache[alert.cache_key] = text
-            return text
+        response = await _get_client().post(_GEMINI_URL, json=payload)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        text: str = data["candidates"][0]["content"]["parts"][0]["text"].strip()
+        _cache_put(alert.cache_key, text)
+        await _backend.set(alert.cache_key, text, AI_CACHE_TTL_SECONDS)
+        return text
 
     except httpx.TimeoutException:
         logger.warning("Gemini API timed out for alert %s", alert.alert_type)
@@ -70,20 +135,75 @@ async def get_ai_explanation(alert: "Alert") -> str:
     except Exception as exc:
         logger.error("Gemini API unexpected error: %s", exc)
 
-    fallback = FALLBACK_EXPLANATIONS.get(alert.alert_type, "No explanation available.")
-    return fallback
+    return FALLBACK_EXPLANATIONS.get(alert.alert_type, "No explanation available.")
+
+
+async def get_ai_explanation(alert: "Alert") -> str:
+    """
+    Return an AI-generated explanation for the alert.
+    Uses a bounded in-memory LRU keyed by (alert_type, symbol, risk_decile);
+    concurrent calls for the same key share a single in-flight request.
+    Falls back to static text if Gemini is not configured or errors out.
+    """
+    cached = _cache_get(alert.cache_key)
+    if cached:
+        return cached
+
+    if not GEMINI_API_KEY:
+        return FALLBACK_EXPLANATIONS.get(alert.alert_type, "No explanation available.")
+
+    pending = _inflight.get(alert.cache_key)
+    if pending is not None:
+        return await pending
+
+    future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+    _inflight[alert.cache_key] = future
+    try:
+        text = await _backend.get(alert.cache_key)
+        if text:
+            _cache_put(alert.cache_key, text)
+        else:
+            text = await _fetch_explanation(alert)
+        future.set_result(text)
+        return text
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        _inflight.pop(alert.cache_key, None)
 
 
 async def enrich_alerts_with_ai(alerts: list["Alert"]) -> None:
-    """Concurrently fetch AI explanations for a list of alerts (in-place)."""
+    """Concurrently fetch AI explanations for a list of alerts (in-place).
+
+    Alerts sharing a cache_key are grouped so each unique key is fetched
+    exactly once, then the result is fanned back out to every alert in
+    the group.
+    """
     if not alerts:
         return
+
+    if not GEMINI_API_KEY:
+        # No LLM configured: assign the static fallbacks directly instead of
+        # paying task creation + a gather round-trip per unique key.
+        for alert in alerts:
+            alert.ai_explanation = FALLBACK_EXPLANATIONS.get(
+                alert.alert_type, "No explanation available."
+            )
+        return
+
+    groups: dict[str, list[Alert]] = defaultdict(list)
+    for alert in alerts:
+        groups[alert.cache_key].append(alert)
+
     explanations = await asyncio.gather(
-        *[get_ai_explanation(a) for a in alerts], return_exceptions=True
+        *[get_ai_explanation(group[0]) for group in groups.values()],
+        return_exceptions=True,
     )
-    for alert, explanation in zip(alerts, explanations):
-        if isinstance(explanation, Exception):
-            logger.error("AI enrichment failed for %s: %s", alert.alert_type, explanation)
-            alert.ai_explanation = FALLBACK_EXPLANATIONS.get(alert.alert_type, "")
-        else:
-            alert.ai_explanation = explanation
+    for group, explanation in zip(groups.values(), explanations):
+        for alert in group:
+            if isinstance(explanation, Exception):
+                logger.error("AI enrichment failed for %s: %s", alert.alert_type, explanation)
+                alert.ai_explanation = FALLBACK_EXPLANATIONS.get(alert.alert_type, "")
+            else:
+                alert.ai_explanation = explanation
@@ -0,0 +1,73 @@
+"""
+Tiered cache backends for AI explanations.
+
+The in-process LRU in ai.py stays tier 1. An optional Redis tier shares
+hits across uvicorn workers and survives restarts/rolling deploys, so the
+Gemini cost for a repeated (alert_type, symbol, risk-decile) key is paid
+once per cluster instead of once per process. Configured via REDIS_URL;
+degrades silently to in-memory-only when unset or when the redis package
+is missing.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Optional, Protocol
+
+from app.core.config import REDIS_URL
+
+logger = logging.getLogger("HabitEngine.cache")
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> Optional[str]: ...
+
+    async def set(self, key: str, value: str, ttl: int) -> None: ...
+
+
+class NullCache:
+    """No-op tier-2 backend used when Redis is not configured."""
+
+    async def get(self, key: str) -> Optional[str]:
+        return None
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        return None
+
+
+class RedisCache:
+    """Redis-backed tier-2 cache with per-key TTL."""
+
+    _PREFIX = "habit:ai:"
+
+    def __init__(self, url: str) -> None:
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return await self._redis.get(self._PREFIX + key)
+        except Exception as exc:
+            logger.warning("Redis get failed: %s", exc)
+            return None
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            await self._redis.setex(self._PREFIX + key, ttl, value)
+        except Exception as exc:
+            logger.warning("Redis set failed: %s", exc)
+
+
+def build_backend() -> CacheBackend:
+    """Pick the tier-2 backend from configuration."""
+    if not REDIS_URL:
+        return NullCache()
+    try:
+        return RedisCache(REDIS_URL)
+    except ImportError:
+        logger.warning(
+            "REDIS_URL is set but the redis package is not installed — "
+            "tier-2 AI cache disabled."
+        )
+        return NullCache()
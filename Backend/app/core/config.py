@@ -9,6 +9,11 @@ GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
 GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
 GEMINI_TIMEOUT: int = int(os.getenv("GEMINI_TIMEOUT", "10"))
 
+# Optional tier-2 AI-explanation cache (shared across workers). Leave
+# REDIS_URL empty to run with the in-process cache only.
+REDIS_URL: str = os.getenv("REDIS_URL", "")
+AI_CACHE_TTL_SECONDS: int = int(os.getenv("AI_CACHE_TTL", str(24 * 3600)))
+
 JWT_SECRET: str = os.getenv("JWT_SECRET", "CHANGE_ME_IN_PRODUCTION")
 JWT_ALGORITHM: str = "HS256"
 JWT_EXPIRE_MINUTES: int = int(os.getenv("JWT_EXPIRE_MINUTES", "60"))
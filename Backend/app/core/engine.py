@@ -7,12 +7,14 @@ revenge trading, concentration risk) and maintains a rolling habit score.
 
 from __future__ import annotations
 
-import hashlib
+import asyncio
 import logging
-from collections import deque
+import threading
+import time
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
-from datetime import datetime
-from typing import Optional, Callable
+from datetime import datetime, timezone
+from typing import Optional, Union
 
 from app.core.config import (
     COOLDOWN_EMOTIONAL_INDEX,
@@ -24,26 +26,40 @@ from app.core.config import (
 logger = logging.getLogger("HabitEngine.alerts")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Trade:
+    """One executed trade. Slotted: thousands of these sit in per-user
+    deques, so fixed-layout storage matters more than dynamic attributes."""
+
     trade_id: str
     symbol: str
     action: str         
     quantity: float
     price: float
-    timestamp: datetime
+    # ns-since-epoch int on the hot request path; datetime accepted for
+    # callers (and tests) that already have one.
+    timestamp: Union[int, datetime]
     pnl: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True, eq=False)
 class Alert:
     alert_type: str
-    severity: str       
+    severity: str
     message: str
-    emotional_risk_score: int   
+    emotional_risk_score: int
     trade: Trade
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    # time.time_ns is ~an order of magnitude cheaper than constructing a
+    # datetime; conversion to ISO text is deferred to to_dict.
+    timestamp: int = field(default_factory=time.time_ns)
     ai_explanation: str = ""
+    _cache_key: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Computed once: the key inputs never change after construction,
+        # and the key is read repeatedly (dedup, cache lookup, cache insert).
+        bucket = self.emotional_risk_score // 10
+        self._cache_key = f"{self.alert_type}:{self.trade.symbol}:{bucket}"
 
     def to_dict(self) -> dict:
         return {
@@ -56,56 +72,111 @@ class Alert:
             "action": self.trade.action,
             "quantity": self.trade.quantity,
             "price": self.trade.price,
-            "time": self.timestamp.isoformat(),
+            "time": datetime.fromtimestamp(
+                self.timestamp / 1e9, tz=timezone.utc
+            ).isoformat(),
         }
 
     @property
     def cache_key(self) -> str:
-        """Stable cache key for AI explanation (bucketed by risk decile)."""
-        bucket = self.emotional_risk_score // 10
-        raw = f"{self.alert_type}:{self.trade.symbol}:{bucket}"
-        return hashlib.md5(raw.encode()).hexdigest()
+        """Stable cache key for AI explanation (bucketed by risk decile).
+
+        Deliberately a plain string, not a digest: the raw key is short,
+        unique, and hashes fine as a dict key, so even a fast
+        non-cryptographic hash (xxhash/blake3) would be pure overhead here.
+        """
+        return self._cache_key
 
 
 class Portfolio:
-    """Tracks live holdings using FIFO-like average cost basis."""
+    """Tracks live holdings using FIFO-like average cost basis.
+
+    Quantities and average prices are kept in parallel dicts with a running
+    total value, so value and concentration queries are O(1) instead of
+    walking nested per-symbol dicts on every trade.
+    """
 
     def __init__(self) -> None:
-        self.holdings: dict[str, dict] = {}  
+        self._qty: dict[str, float] = {}
+        self._avg: dict[str, float] = {}
+        self._total_value: float = 0.0
+
+    @property
+    def holdings(self) -> dict[str, dict]:
+        """Dict-of-dicts view, synthesized on demand for external readers."""
+        return {
+            sym: {"quantity": qty, "avg_price": self._avg[sym]}
+            for sym, qty in self._qty.items()
+        }
+
+    @holdings.setter
+    def holdings(self, value: dict[str, dict]) -> None:
+        self._qty = {sym: h["quantity"] for sym, h in value.items()}
+        self._avg = {sym: h["avg_price"] for sym, h in value.items()}
+        self._total_value = sum(
+            qty * self._avg[sym] for sym, qty in self._qty.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self._qty)
 
     def apply_trade(self, trade: Trade) -> None:
         sym = trade.symbol
 
         if trade.action == "BUY":
-            h = self.holdings.get(sym, {"quantity": 0.0, "avg_price": 0.0})
-            new_qty = h["quantity"] + trade.quantity
-            new_avg = (
-                h["quantity"] * h["avg_price"] + trade.quantity * trade.price
-            ) / new_qty
-            self.holdings[sym] = {"quantity": new_qty, "avg_price": round(new_avg, 4)}
+            old_qty = self._qty.get(sym, 0.0)
+            old_avg = self._avg.get(sym, 0.0)
+            new_qty = old_qty + trade.quantity
+            new_avg = round(
+                (old_qty * old_avg + trade.quantity * trade.price) / new_qty, 4
+            )
+            self._total_value += new_qty * new_avg - old_qty * old_avg
+            self._qty[sym] = new_qty
+            self._avg[sym] = new_avg
 
         elif trade.action == "SELL":
-            if sym not in self.holdings:
+            if sym not in self._qty:
                 logger.warning("SELL on unknown position: %s", sym)
                 return
-            self.holdings[sym]["quantity"] -= trade.quantity
-            if self.holdings[sym]["quantity"] <= 0:
-                del self.holdings[sym]
+            avg = self._avg[sym]
+            remaining = self._qty[sym] - trade.quantity
+            self._total_value -= trade.quantity * avg
+            if remaining <= 0:
+                # Over-sells would otherwise leave a negative residue behind.
+                self._total_value -= remaining * avg
+                del self._qty[sym]
+                del self._avg[sym]
+            else:
+                self._qty[sym] = remaining
 
     @property
     def total_value_proxy(self) -> float:
         """Sum of quantity × avg_price (a proxy; real value needs live prices)."""
-        return sum(
-            h["quantity"] * h["avg_price"] for h in self.holdings.values()
-        )
+        return self._total_value
 
     def concentration(self, symbol: str) -> float:
         """Fraction of portfolio value held in one symbol (0–1)."""
-        total = self.total_value_proxy
-        if total <= 0 or symbol not in self.holdings:
+        total = self._total_value
+        qty = self._qty.get(symbol)
+        if total <= 0 or qty is None:
             return 0.0
-        h = self.holdings[symbol]
-        return (h["quantity"] * h["avg_price"]) / total
+        return (qty * self._avg[symbol]) / total
+
+    def concentration_exceeds(self, symbol: str, threshold: float) -> tuple[bool, float]:
+        """Test `concentration(symbol) >= threshold` without dividing.
+
+        The common "no alert" case is a multiply plus a compare against the
+        cached total; the divide is only paid when an alert will actually
+        be raised. Returns (exceeded, concentration-or-0.0).
+        """
+        total = self._total_value
+        qty = self._qty.get(symbol)
+        if total <= 0 or qty is None:
+            return False, 0.0
+        held_value = qty * self._avg[symbol]
+        if held_value < threshold * total:
+            return False, 0.0
+        return True, held_value / total
 
 
 def detect_panic_sell(trade: Trade, price_before: float) -> Optional[Alert]:
@@ -144,8 +215,8 @@ def detect_concentration_risk(
     trade: Trade, portfolio: Portfolio, threshold: float = 0.40
 ) -> Optional[Alert]:
     """Flag if a single position exceeds `threshold` of portfolio value after trade."""
-    conc = portfolio.concentration(trade.symbol)
-    if conc < threshold:
+    exceeded, conc = portfolio.concentration_exceeds(trade.symbol, threshold)
+    if not exceeded:
         return None
     risk = min(100, int(50 + conc * 50))
     return Alert(
@@ -166,17 +237,31 @@ class BehavioralAlertEngine:
 
     def __init__(self) -> None:
         self.portfolio = Portfolio()
+        # Serializes analyze() calls for this user; held by the trades route.
+        self.lock = asyncio.Lock()
         self.recent_trades: deque[Trade] = deque(maxlen=RECENT_TRADE_WINDOW)
-        self.alert_history: list[Alert] = []
+        # Bounded so long-running servers don't grow without limit; O(1)
+        # appends and cheap reversed() iteration for history reads.
+        self.alert_history: deque[Alert] = deque(maxlen=10_000)
         self.habit_score: float = 100.0
+        # Rolling window of the last 10 alert scores with a running sum,
+        # so emotional_index is O(1) no matter how large the history grows.
+        self._recent_alert_scores: deque[int] = deque(maxlen=10)
+        self._recent_score_sum: int = 0
 
     @property
     def emotional_index(self) -> float:
         """Rolling average risk score of the last 10 alerts (0–100)."""
-        window = self.alert_history[-10:]
-        if not window:
+        if not self._recent_alert_scores:
             return 0.0
-        return sum(a.emotional_risk_score for a in window) / len(window)
+        return self._recent_score_sum / len(self._recent_alert_scores)
+
+    def _track_alert_score(self, score: int) -> None:
+        scores = self._recent_alert_scores
+        if len(scores) == scores.maxlen:
+            self._recent_score_sum -= scores[0]
+        scores.append(score)
+        self._recent_score_sum += score
 
     @property
     def cooldown_recommended(self) -> bool:
@@ -190,16 +275,13 @@ class BehavioralAlertEngine:
         """
         self.recent_trades.append(trade)
 
-        detectors: list[Callable[[Trade, float], Optional[Alert]]] = [
-            lambda t, pb: detect_panic_sell(t, pb),
-            lambda t, pb: detect_fomo_buy(t, pb),
-        ]
-
         triggered: list[Alert] = []
-        for fn in detectors:
-            alert = fn(trade, price_before)
-            if alert:
-                triggered.append(alert)
+        alert = detect_panic_sell(trade, price_before)
+        if alert:
+            triggered.append(alert)
+        alert = detect_fomo_buy(trade, price_before)
+        if alert:
+            triggered.append(alert)
 
         self.portfolio.apply_trade(trade)
         conc_alert = detect_concentration_risk(trade, self.portfolio)
@@ -207,11 +289,17 @@ class BehavioralAlertEngine:
             triggered.append(conc_alert)
 
         self.alert_history.extend(triggered)
+        for a in triggered:
+            self._track_alert_score(a.emotional_risk_score)
+        # Branchless clamp at both update sites keeps the score in [0, 100]
+        # without prediction-hostile if/elif chains as penalties and rewards
+        # alternate under load.
         if triggered:
             avg_risk = sum(a.emotional_risk_score for a in triggered) / len(triggered)
-            self.habit_score = max(0.0, self.habit_score - avg_risk * 0.05)
+            delta = -avg_risk * 0.05
         else:
-            self.habit_score = min(100.0, self.habit_score + 1.0)
+            delta = 1.0
+        self.habit_score = max(0.0, min(100.0, self.habit_score + delta))
 
         logger.info(
             "Trade %s analysed | alerts=%d | habit_score=%.1f | ei=%.1f",
@@ -230,5 +318,39 @@ class BehavioralAlertEngine:
             "cooldown_recommended": self.cooldown_recommended,
             "total_trades_analysed": len(self.recent_trades),
             "total_alerts": len(self.alert_history),
-            "portfolio_positions": len(self.portfolio.holdings),
+            "portfolio_positions": len(self.portfolio),
         }
+
+
+class EngineRegistry:
+    """
+    Per-user engine instances, so trades for different users analyse
+    concurrently instead of contending on one shared mutable engine.
+
+    Each engine carries its own asyncio.Lock (held by the trades route while
+    analysing). Inactive users are evicted LRU-style to bound memory in
+    long-running servers.
+    """
+
+    def __init__(self, max_users: int = 1024) -> None:
+        self._engines: OrderedDict[str, BehavioralAlertEngine] = OrderedDict()
+        self._max_users = max_users
+        # get() runs both on the event loop and in threadpool threads (sync
+        # handlers); without this lock two first requests for a user could
+        # each create an engine and one would silently overwrite the other.
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str = "default") -> BehavioralAlertEngine:
+        with self._lock:
+            engine = self._engines.get(user_id)
+            if engine is None:
+                engine = BehavioralAlertEngine()
+                self._engines[user_id] = engine
+            self._engines.move_to_end(user_id)
+            while len(self._engines) > self._max_users:
+                evicted, _ = self._engines.popitem(last=False)
+                logger.info("Evicted inactive engine for user %s", evicted)
+            return engine
+
+    def __len__(self) -> int:
+        return len(self._engines)
@@ -1,16 +1,19 @@
+import functools
 import logging
 from contextlib import asynccontextmanager
 
+import fastapi.dependencies.utils as _dep_utils
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 
+from app.core.ai import aclose_client
 from app.core.config import APP_TITLE, APP_VERSION, CORS_ORIGINS, GEMINI_API_KEY
-from app.core.engine import BehavioralAlertEngine
+from app.core.engine import EngineRegistry
 from app.core.schemas import HealthResponse
 from app.model.predictor import Predictor
 from app.routes.trades import router as trades_router
-from app.routes.prediction import router as prediction_router
+from app.routes.prediction import build_schema_bytes, router as prediction_router
 from app.routes.charts import router as charts_router
 
 # Setup Logging
@@ -21,6 +24,24 @@ logging.basicConfig(
 logger = logging.getLogger("HabitEngine")
 
 
+def _memoize_dependency_inspection() -> None:
+    """Backport of the fastapi#13974 pattern.
+
+    solve_dependencies re-runs coroutine/generator inspection on every
+    dependency callable for every request (get_engine, get_predictor, ...),
+    yet the answer never changes for a given callable. Memoize the checks
+    until the pinned FastAPI version ships the upstream fix; skip anything
+    already cached so a fixed FastAPI is left untouched.
+    """
+    for name in ("is_coroutine_callable", "is_async_gen_callable", "is_gen_callable"):
+        fn = getattr(_dep_utils, name, None)
+        if fn is not None and not hasattr(fn, "cache_clear"):
+            setattr(_dep_utils, name, functools.lru_cache(maxsize=None)(fn))
+
+
+_memoize_dependency_inspection()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -29,17 +50,20 @@ async def lifespan(app: FastAPI):
     """
     logger.info("Starting up HabitEngine...")
     
-    # Initialize Engine Singleton
-    app.state.engine = BehavioralAlertEngine()
+    # Initialize per-user engine registry
+    app.state.engines = EngineRegistry()
+    # Per-user (timestamp, bytes) cache for the polled stats-summary route
+    app.state.stats_cache = {}
     
-    # Initialize Predictor and load models
-    predictor = Predictor()
-    predictor.load_models()
-    app.state.predictor = predictor
+    # Initialize Predictor and load models (memoized per process)
+    app.state.predictor = Predictor.instance()
+    # Feature schema never changes after load: serialize it once
+    app.state.schema_bytes = build_schema_bytes(app.state.predictor)
     
     logger.info("HabitEngine startup complete.")
     yield
     logger.info("Shutting down HabitEngine...")
+    await aclose_client()
 
 
 app = FastAPI(
@@ -51,6 +75,7 @@ app = FastAPI(
     ),
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -79,21 +104,25 @@ app.include_router(prediction_router)
 app.include_router(charts_router)
 
 
-@app.get("/health", response_model=HealthResponse, tags=["System"])
-def health(request: Request) -> HealthResponse:
-    """Comprehensive health check for models, API, and engine."""
+@app.get("/health", responses={200: {"model": HealthResponse}}, tags=["System"])
+def health(request: Request) -> dict:
+    """Comprehensive health check for models, API, and engine.
+
+    Load balancers poll this endpoint at high frequency, so it returns a
+    plain dict and skips the Pydantic validation cycle entirely.
+    """
     predictor: Predictor = request.app.state.predictor
-    engine_active = hasattr(request.app.state, "engine") and request.app.state.engine is not None
-    
+    engine_active = hasattr(request.app.state, "engines") and request.app.state.engines is not None
+
     all_models_loaded = all(predictor.models_loaded.values())
-    
-    return HealthResponse(
-        status="running" if all_models_loaded else "degraded (rule-based fallback active)",
-        version=APP_VERSION,
-        gemini_enabled=bool(GEMINI_API_KEY),
-        models_loaded=predictor.models_loaded,
-        engine_active=engine_active,
-    )
+
+    return {
+        "status": "running" if all_models_loaded else "degraded (rule-based fallback active)",
+        "version": APP_VERSION,
+        "gemini_enabled": bool(GEMINI_API_KEY),
+        "models_loaded": predictor.models_loaded,
+        "engine_active": engine_active,
+    }
 
 
 @app.get("/", tags=["System"])
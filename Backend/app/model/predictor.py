@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import logging
-import pickle
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
+import joblib
 import numpy as np
 
 from app.core.config import (
@@ -18,8 +20,38 @@ _CORRUPTION_MARKER = b"\xef\xbf\xbd"
 
 
 class Predictor:
+    PREDICT_CACHE_SIZE = 4096
+
+    _instance: "Predictor | None" = None
+
+    @classmethod
+    def instance(cls) -> "Predictor":
+        """Process-wide predictor with models loaded exactly once.
+
+        Routes and tests should prefer this over the constructor so worker
+        reloads and repeated fixtures never re-read the pickled artifacts
+        from disk.
+        """
+        if cls._instance is None:
+            predictor = cls()
+            predictor.load_models()
+            cls._instance = predictor
+        return cls._instance
+
+    @classmethod
+    def reset_instance(cls) -> None:
+        """Drop the memoized instance (next instance() call reloads models)."""
+        cls._instance = None
+
     def __init__(self):
+        # Sync route handlers run in FastAPI's threadpool, so concurrent
+        # requests share this instance; the lock serializes use of the
+        # preallocated input buffer.
+        self._lock = threading.Lock()
         self._artifacts: dict[str, Any] = {}
+        self._predict_cache: OrderedDict[tuple, dict[str, Any]] = OrderedDict()
+        self._compiled: dict[str, Any] = {}
+        self._tl_runtime: Any = None
         self.feature_columns: list[str] = FEATURE_COLUMNS
         self.models_loaded: dict[str, bool] = {
             "behavior": False,
@@ -28,6 +60,13 @@ class Predictor:
             "label_encoder": False,
             "feature_columns": False,
         }
+        self._rebuild_feature_buffer()
+
+    def _rebuild_feature_buffer(self) -> None:
+        """(Re)build the reusable input buffer and column-index map."""
+        self._col_idx: dict[str, int] = {c: i for i, c in enumerate(self.feature_columns)}
+        # float64 matches what the sklearn/XGB models were trained on.
+        self._X_buf: np.ndarray = np.empty((1, len(self.feature_columns)), dtype=np.float64)
 
     def load_models(self):
         """Load all model artifacts from disk."""
@@ -45,76 +84,313 @@ class Predictor:
         
         if self._artifacts.get("feature_columns") and isinstance(self._artifacts["feature_columns"], list):
             self.feature_columns = self._artifacts["feature_columns"]
+            self._rebuild_feature_buffer()
+
+        self._load_compiled()
+        self._predict_cache.clear()
 
         logger.info("Predictor initialization: %s", self.models_loaded)
 
+    def _load_compiled(self) -> None:
+        """Pick up Treelite-compiled ensembles (.so) when the runtime is installed."""
+        self._compiled = {}
+        try:
+            import treelite_runtime
+        except ImportError:
+            return
+        self._tl_runtime = treelite_runtime
+        for key in ("behavior", "discipline", "habit"):
+            libpath = MODEL_DIR / f"{key}_model.so"
+            if not libpath.exists():
+                continue
+            try:
+                self._compiled[key] = treelite_runtime.Predictor(str(libpath))
+                logger.info("Loaded compiled model %s", libpath.name)
+            except Exception as exc:
+                logger.warning("Failed to load compiled model %s: %s", libpath.name, exc)
+
+    @staticmethod
+    def _is_corrupted(path: Path) -> bool:
+        """Scan the whole file for the marker in fixed-size chunks.
+
+        Keeps a small overlap between chunks so a marker straddling a chunk
+        boundary is still found, without ever holding the file in memory.
+        """
+        overlap = len(_CORRUPTION_MARKER) - 1
+        tail = b""
+        with path.open("rb") as f:
+            while chunk := f.read(1 << 16):
+                if _CORRUPTION_MARKER in tail + chunk:
+                    return True
+                tail = chunk[-overlap:]
+        return False
+
     def _load_artifact(self, path: Path) -> Any | None:
         if not path.exists():
             logger.warning("Artifact not found: %s — using fallback.", path)
             return None
 
         try:
-            raw = path.read_bytes()
-            if _CORRUPTION_MARKER in raw:
+            if self._is_corrupted(path):
                 logger.error("Artifact %s is corrupted (UTF-8 replacement characters found).", path.name)
                 return None
-            return pickle.loads(raw)
+            # joblib reads plain pickles too; mmap keeps the ndarray pages
+            # file-backed and shared across forked workers.
+            return joblib.load(path, mmap_mode="r")
         except Exception as exc:
-            logger.error("Failed to unpickle %s: %s", path.name, exc)
+            logger.error("Failed to load %s: %s", path.name, exc)
             return None
 
+    def _feat_dict_from_buffer(self) -> dict[str, float]:
+        """Materialize the column-name view of the current input buffer."""
+        return dict(zip(self.feature_columns, self._X_buf[0].tolist()))
+
+    @staticmethod
+    def _freeze_features(features: list[float] | dict[str, float]) -> tuple | None:
+        """Hashable cache key for a feature vector, or None if not freezable."""
+        try:
+            if isinstance(features, dict):
+                return tuple(sorted((k, float(v)) for k, v in features.items()))
+            if isinstance(features, (list, tuple, np.ndarray)):
+                return tuple(float(v) for v in features)
+        except (TypeError, ValueError):
+            pass
+        return None
+
     def predict(self, features: list[float] | dict[str, float]) -> dict[str, Any]:
-        """Predict behavior, discipline, and habit score with fallback."""
+        """Cached predict: identical feature vectors skip the model forward pass.
+
+        Dashboards polling with default query params and the zero-vector
+        smoke test repeat inputs constantly; a hit costs one dict lookup.
+        The cache is cleared whenever models are (re)loaded.
+
+        The lookup-compute-insert path holds the predictor lock so a cache
+        entry can only ever hold the result computed for its own key, and
+        so the OrderedDict is never mutated from two threadpool threads.
+        """
+        key = self._freeze_features(features)
+        with self._lock:
+            if key is None:
+                return self._predict_buffered(features)
+            cached = self._predict_cache.get(key)
+            if cached is not None:
+                self._predict_cache.move_to_end(key)
+                return dict(cached)
+            result = self._predict_buffered(features)
+            self._predict_cache[key] = result
+            while len(self._predict_cache) > self.PREDICT_CACHE_SIZE:
+                self._predict_cache.popitem(last=False)
+            return dict(result)
+
+    def _predict_buffered(self, features: list[float] | dict[str, float]) -> dict[str, Any]:
+        """Predict behavior, discipline, and habit score with fallback.
+
+        Ordered list/array input goes straight into the preallocated buffer;
+        the column-name dict is only built lazily when the rule-based
+        fallback needs it. The buffer is shared mutable state: callers must
+        hold self._lock for the whole fill-then-score sequence.
+        """
+        X = self._X_buf
+        feat_dict: dict[str, float] | None = None
+        input_echo: list[float] | dict[str, float]
+
         if isinstance(features, (list, tuple, np.ndarray)):
             if len(features) != len(self.feature_columns):
                 raise ValueError(f"Expected {len(self.feature_columns)} features, got {len(features)}.")
-            feat_dict = dict(zip(self.feature_columns, [float(v) for v in features]))
+            np.copyto(X[0], np.asarray(features, dtype=X.dtype))
+            input_echo = [float(v) for v in features]
         elif isinstance(features, dict):
             feat_dict = {col: float(features.get(col, 0)) for col in self.feature_columns}
+            for col, i in self._col_idx.items():
+                X[0, i] = feat_dict[col]
+            input_echo = feat_dict
         else:
             raise TypeError("features must be list, tuple, ndarray, or dict.")
 
-        X = np.array([feat_dict[c] for c in self.feature_columns]).reshape(1, -1)
-
         behavior_model = self._artifacts.get("behavior")
         discipline_model = self._artifacts.get("discipline")
         habit_model = self._artifacts.get("habit")
 
         if behavior_model is None and discipline_model is None and habit_model is None:
-            return self._rule_based_predict(feat_dict)
+            if feat_dict is None:
+                feat_dict = self._feat_dict_from_buffer()
+            result = self._rule_based_predict(feat_dict)
+            result["input_features"] = input_echo
+            return result
 
-        result: dict[str, Any] = {"fallback_used": False, "input_features": feat_dict}
+        result: dict[str, Any] = {"fallback_used": False, "input_features": input_echo}
 
         # Predict Behavior
         if behavior_model:
-            pred, prob = self._predict_single(behavior_model, X)
+            pred, prob = self._predict_single("behavior", behavior_model, X)
             result["behavior"] = self._decode_label(pred)
             result["behavior_confidence"] = round(float(prob), 4) if prob is not None else None
         else:
+            if feat_dict is None:
+                feat_dict = self._feat_dict_from_buffer()
             result["behavior"] = self._rule_based_predict(feat_dict)["behavior"]
             result["behavior_confidence"] = None
 
         # Predict Discipline
         if discipline_model:
-            pred, prob = self._predict_single(discipline_model, X)
+            pred, prob = self._predict_single("discipline", discipline_model, X)
             result["discipline"] = self._decode_label(pred)
             result["discipline_confidence"] = round(float(prob), 4) if prob is not None else None
         else:
+            if feat_dict is None:
+                feat_dict = self._feat_dict_from_buffer()
             result["discipline"] = self._rule_based_predict(feat_dict)["discipline"]
             result["discipline_confidence"] = None
 
         # Predict Habit Score
         if habit_model:
-            pred, prob = self._predict_single(habit_model, X)
+            pred, prob = self._predict_single("habit", habit_model, X)
             result["habit_score"] = round(float(pred), 2)
             result["habit_confidence"] = round(float(prob), 4) if prob is not None else None
         else:
+            if feat_dict is None:
+                feat_dict = self._feat_dict_from_buffer()
             result["habit_score"] = self._rule_based_predict(feat_dict)["habit_score"]
             result["habit_confidence"] = None
 
         return result
 
-    def _predict_single(self, model: Any, X: np.ndarray) -> tuple[Any, float | None]:
+    def predict_batch(
+        self, features_list: list[list[float] | dict[str, float]]
+    ) -> list[dict[str, Any]]:
+        """Predict many rows at once — one model call per head instead of per row."""
+        if not features_list:
+            return []
+
+        n = len(self.feature_columns)
+        X = np.empty((len(features_list), n), dtype=np.float64)
+        feat_dicts: list[dict[str, float]] = []
+        for r, features in enumerate(features_list):
+            if isinstance(features, (list, tuple, np.ndarray)):
+                if len(features) != n:
+                    raise ValueError(f"Expected {n} features, got {len(features)}.")
+                feat_dict = dict(zip(self.feature_columns, [float(v) for v in features]))
+            elif isinstance(features, dict):
+                feat_dict = {col: float(features.get(col, 0)) for col in self.feature_columns}
+            else:
+                raise TypeError("features must be list, tuple, ndarray, or dict.")
+            feat_dicts.append(feat_dict)
+            for col, i in self._col_idx.items():
+                X[r, i] = feat_dict[col]
+
+        behavior_model = self._artifacts.get("behavior")
+        discipline_model = self._artifacts.get("discipline")
+        habit_model = self._artifacts.get("habit")
+
+        if behavior_model is None and discipline_model is None and habit_model is None:
+            return self._rule_based_batch(X)
+
+        results: list[dict[str, Any]] = [
+            {"fallback_used": False, "input_features": fd} for fd in feat_dicts
+        ]
+        rule_based: list[dict[str, Any]] | None = None
+
+        for key, model in (("behavior", behavior_model), ("discipline", discipline_model)):
+            if model:
+                preds, probs = self._predict_rows(key, model, X)
+                labels = self._decode_labels(preds)
+                for r, result in enumerate(results):
+                    result[key] = labels[r]
+                    result[f"{key}_confidence"] = (
+                        round(float(probs[r]), 4) if probs is not None else None
+                    )
+            else:
+                if rule_based is None:
+                    rule_based = self._rule_based_batch(X)
+                for r, result in enumerate(results):
+                    result[key] = rule_based[r][key]
+                    result[f"{key}_confidence"] = None
+
+        if habit_model:
+            preds, probs = self._predict_rows("habit", habit_model, X)
+            for r, result in enumerate(results):
+                result["habit_score"] = round(float(preds[r]), 2)
+                result["habit_confidence"] = (
+                    round(float(probs[r]), 4) if probs is not None else None
+                )
+        else:
+            if rule_based is None:
+                rule_based = self._rule_based_batch(X)
+            for r, result in enumerate(results):
+                result["habit_score"] = rule_based[r]["habit_score"]
+                result["habit_confidence"] = None
+
+        return results
+
+    def _xgb_inplace_predict(
+        self, model: Any, X: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray | None] | None:
+        """Fast path for XGBoost sklearn wrappers.
+
+        Booster.inplace_predict scores straight from the ndarray without
+        building a DMatrix per call. Returns None when the model is not an
+        XGBoost wrapper (e.g. the RandomForest fallback) so callers fall
+        through to the generic sklearn path.
+        """
+        get_booster = getattr(model, "get_booster", None)
+        if get_booster is None:
+            return None
+        try:
+            out = get_booster().inplace_predict(X)
+        except Exception:
+            return None
+        if getattr(out, "ndim", 1) == 2:
+            # Multi-class softprob output: rows of per-class probabilities.
+            return out.argmax(axis=1), out.max(axis=1)
+        return out, None
+
+    def _compiled_predict(
+        self, key: str, X: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray | None] | None:
+        """Score via a Treelite-compiled library, or None when unavailable."""
+        compiled = self._compiled.get(key)
+        if compiled is None:
+            return None
+        try:
+            out = np.asarray(compiled.predict(self._tl_runtime.DMatrix(X)))
+        except Exception as exc:
+            logger.warning("Compiled predict failed for %s: %s", key, exc)
+            return None
+        if out.ndim == 2:
+            return out.argmax(axis=1), out.max(axis=1)
+        return out, None
+
+    def _predict_rows(
+        self, key: str, model: Any, X: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray | None]:
+        fast = self._compiled_predict(key, X)
+        if fast is not None:
+            return fast
+        fast = self._xgb_inplace_predict(model, X)
+        if fast is not None:
+            return fast
+        preds = model.predict(X)
+        probs: np.ndarray | None = None
+        try:
+            probs = model.predict_proba(X).max(axis=1)
+        except Exception:
+            pass
+        return preds, probs
+
+    def _decode_labels(self, preds: np.ndarray) -> list[str]:
+        le = self._artifacts.get("label_encoder")
+        if le is None:
+            return [str(p) for p in preds]
+        try:
+            return [str(label) for label in le.inverse_transform(preds)]
+        except Exception:
+            return [str(p) for p in preds]
+
+    def _predict_single(self, key: str, model: Any, X: np.ndarray) -> tuple[Any, float | None]:
+        fast = self._compiled_predict(key, X) or self._xgb_inplace_predict(model, X)
+        if fast is not None:
+            preds, probs = fast
+            return preds[0], (float(probs[0]) if probs is not None else None)
         pred = model.predict(X)[0]
         prob: float | None = None
         try:
@@ -133,6 +409,70 @@ class Predictor:
         except Exception:
             return str(pred)
 
+    _RULE_COLUMNS = (
+        "max_loss_streak",
+        "trades_after_loss_ratio",
+        "avg_trades_per_day",
+        "risk_per_trade_percent",
+        "max_drawdown_percent",
+        "win_rate",
+    )
+
+    def _rule_based_batch(self, X: np.ndarray) -> list[dict[str, Any]]:
+        """Vectorized rule-based fallback over a (B, F) feature matrix.
+
+        Mirrors _rule_based_predict, but evaluates every rule as a boolean
+        mask and selects labels/scores with np.select instead of branching
+        per row in Python.
+        """
+        idx = self._col_idx
+        if any(col not in idx for col in self._RULE_COLUMNS):
+            # Artifact-defined feature columns without the rule inputs:
+            # fall back to the scalar path with defaulted lookups.
+            return [
+                self._rule_based_predict(dict(zip(self.feature_columns, row.tolist())))
+                for row in X
+            ]
+
+        loss_streak = X[:, idx["max_loss_streak"]]
+        tal_ratio = X[:, idx["trades_after_loss_ratio"]]
+        avg_trades = X[:, idx["avg_trades_per_day"]]
+        risk_pct = X[:, idx["risk_per_trade_percent"]]
+        drawdown = X[:, idx["max_drawdown_percent"]]
+        win_rate = X[:, idx["win_rate"]]
+
+        m_revenge = (loss_streak >= 3) & (tal_ratio >= 0.6)
+        m_over = ~m_revenge & ((avg_trades >= 10) | (risk_pct >= 5))
+        m_high_risk = ~m_revenge & ~m_over & (drawdown >= 20)
+        conds = [m_revenge, m_over, m_high_risk]
+
+        behavior = np.select(
+            conds, ["Revenge Trader", "Overtrader", "High Risk Trader"], default="Disciplined"
+        )
+        discipline = np.select(
+            conds, ["Impulsive", "Undisciplined", "Reckless"], default="Consistent"
+        )
+        h_score = np.select(
+            conds,
+            [40.0 - loss_streak * 5, 50.0 - avg_trades * 2, 55.0 - drawdown],
+            default=60.0 + win_rate * 40,
+        )
+        h_score = np.round(np.clip(h_score, 0.0, 100.0), 2)
+
+        return [
+            {
+                "behavior": str(behavior[r]),
+                "discipline": str(discipline[r]),
+                "habit_score": float(h_score[r]),
+                "behavior_confidence": None,
+                "discipline_confidence": None,
+                "habit_confidence": None,
+                "fallback_used": True,
+                "input_features": dict(zip(self.feature_columns, X[r].tolist())),
+            }
+            for r in range(X.shape[0])
+        ]
+
     def _rule_based_predict(self, features: dict[str, float]) -> dict[str, Any]:
         loss_streak = features.get("max_loss_streak", 0)
         tal_ratio = features.get("trades_after_loss_ratio", 0)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-import pickle
+import joblib
 import numpy as np
 from pathlib import Path
 from sklearn.preprocessing import LabelEncoder
@@ -37,30 +37,63 @@ def generate_data():
         np.random.randint(0, 4, N),         
     ])
 
-    behavior_labels = []
-    discipline_labels = []
-    habit_scores = []
-
-    for row in X:
-        trades, wr, loss_streak, drawdown, pos_size, risk_pct, tal, hold_min, _ = row
-        if loss_streak >= 4 and tal >= 0.5:
-            b, d, h = "Revenge Trader", "Impulsive", max(0, 35 - loss_streak * 4 + wr * 20)
-        elif trades >= 10 or risk_pct >= 4:
-            b, d, h = "Overtrader", "Undisciplined", max(0, 45 - trades * 1.5 + wr * 15)
-        elif drawdown >= 20:
-            b, d, h = "High Risk Trader", "Reckless", max(0, 50 - drawdown + wr * 20)
+    trades, wr, loss_streak, drawdown, _pos, risk_pct, tal, _hold, _ = X.T
+
+    m_revenge = (loss_streak >= 4) & (tal >= 0.5)
+    m_over = ~m_revenge & ((trades >= 10) | (risk_pct >= 4))
+    m_high_risk = ~m_revenge & ~m_over & (drawdown >= 20)
+    conds = [m_revenge, m_over, m_high_risk]
+
+    behavior_labels = np.select(
+        conds, ["Revenge Trader", "Overtrader", "High Risk Trader"], default="Disciplined"
+    )
+    discipline_labels = np.select(
+        conds, ["Impulsive", "Undisciplined", "Reckless"], default="Consistent"
+    )
+    habit = np.select(
+        conds,
+        [
+            np.maximum(0, 35 - loss_streak * 4 + wr * 20),
+            np.maximum(0, 45 - trades * 1.5 + wr * 15),
+            np.maximum(0, 50 - drawdown + wr * 20),
+        ],
+        default=np.minimum(100, 60 + wr * 35),
+    )
+    habit_scores = np.round(habit + np.random.normal(0, 3, N), 2)
+
+    return X, behavior_labels, discipline_labels, habit_scores
+
+def export_compiled(model, name: str):
+    """Optionally compile a tree ensemble to a native shared library via Treelite.
+
+    Quantized, branch-free C beats interpreted tree traversal by an order of
+    magnitude for small batches; the predictor picks up the .so when the
+    treelite runtime is installed, otherwise the pickled model is used as-is.
+    """
+    try:
+        import treelite
+    except ImportError:
+        print(f"  ⚠ Treelite not installed — skipping compiled export for {name}")
+        return
+    try:
+        if USE_XGB:
+            tl_model = treelite.Model.from_xgboost(model.get_booster())
         else:
-            b, d, h = "Disciplined", "Consistent", min(100, 60 + wr * 35)
-        behavior_labels.append(b)
-        discipline_labels.append(d)
-        habit_scores.append(round(h + np.random.normal(0, 3), 2))
-
-    return X, behavior_labels, discipline_labels, np.array(habit_scores)
+            tl_model = treelite.sklearn.import_model(model)
+        libpath = OUTPUT_DIR / f"{name}.so"
+        tl_model.export_lib(
+            toolchain="gcc",
+            libpath=str(libpath),
+            params={"quantize": 1, "parallel_comp": 4},
+        )
+        print(f"  ✓ Compiled {name}.so (quantized thresholds)")
+    except Exception as exc:
+        print(f"  ⚠ Treelite export failed for {name}: {exc}")
 
 def save(obj, filename: str):
     path = OUTPUT_DIR / filename
-    with open(path, "wb") as f:
-        pickle.dump(obj, f, protocol=4)
+    # Uncompressed joblib keeps ndarrays raw on disk so they can be mmapped at load.
+    joblib.dump(obj, path, compress=0, protocol=4)
     print(f"  ✓ Saved {filename} ({path.stat().st_size / 1024:.1f} KB)")
 
 def main():
@@ -95,6 +128,9 @@ def main():
     save(habit_model, "habit_model.pkl")
     save(le, "label_encoder.pkl")
     save(FEATURE_COLUMNS, "feature_columns.pkl")
+    export_compiled(behavior_model, "behavior_model")
+    export_compiled(discipline_model, "discipline_model")
+    export_compiled(habit_model, "habit_model")
     print(f"\n✅ All artifacts saved to: {OUTPUT_DIR}")
 
 if __name__ == "__main__":
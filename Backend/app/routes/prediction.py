@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Depends, Request
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 
 from app.core.schemas import PredictRequest, PredictResponse
 from app.model.predictor import Predictor
@@ -12,32 +13,51 @@ def get_predictor(request: Request):
     return request.app.state.predictor
 
 
-@router.post("/", response_model=PredictResponse, summary="Predict trader profile from feature vector")
+# response_model would re-validate and re-encode the already-constructed
+# model on the way out; the responses mapping keeps the OpenAPI schema
+# while the handlers validate exactly once.
+@router.post("/", response_model=None, responses={200: {"model": PredictResponse}}, summary="Predict trader profile from feature vector")
 def predict_endpoint(
     req: PredictRequest,
     predictor: Predictor = Depends(get_predictor)
-) -> PredictResponse:
+) -> dict:
     try:
         result = predictor.predict(req.features)
     except (ValueError, TypeError) as exc:
         raise HTTPException(status_code=422, detail=str(exc)) from exc
-    return PredictResponse(**result)
+    # model_construct skips per-field validation: the predictor already
+    # returns well-typed values for every field. exclude_none drops the
+    # confidence fields models without predict_proba cannot provide.
+    return PredictResponse.model_construct(**result).model_dump(exclude_none=True)
 
 
-@router.get("/test", response_model=PredictResponse, summary="Smoke-test prediction with zero vector")
-def test_prediction(predictor: Predictor = Depends(get_predictor)) -> PredictResponse:
+@router.get("/test", response_model=None, responses={200: {"model": PredictResponse}}, summary="Smoke-test prediction with zero vector")
+def test_prediction(predictor: Predictor = Depends(get_predictor)) -> dict:
     dummy = [0.0] * len(predictor.feature_columns) if predictor.feature_columns else [0.0]
     result = predictor.predict(dummy)
-    return PredictResponse(**result)
+    return PredictResponse.model_construct(**result).model_dump(exclude_none=True)
+
+
+def build_schema_bytes(predictor: Predictor) -> bytes:
+    """Serialize the feature schema once; called from the app lifespan."""
+    return orjson.dumps(
+        {
+            "feature_columns": predictor.feature_columns,
+            "count": len(predictor.feature_columns),
+            "note": (
+                "Pass features as an ordered list (same length as feature_columns) "
+                "or as a dict {column_name: value}.  Missing dict keys default to 0."
+            ),
+        }
+    )
 
 
 @router.get("/schema", summary="Return expected feature columns in canonical order")
-def get_schema(predictor: Predictor = Depends(get_predictor)) -> dict:
-    return {
-        "feature_columns": predictor.feature_columns,
-        "count": len(predictor.feature_columns),
-        "note": (
-            "Pass features as an ordered list (same length as feature_columns) "
-            "or as a dict {column_name: value}.  Missing dict keys default to 0."
-        ),
-    }
+def get_schema(request: Request) -> Response:
+    # The schema is fixed for the life of the process: serve the bytes
+    # serialized at startup and let clients cache them for an hour.
+    return Response(
+        content=request.app.state.schema_bytes,
+        media_type="application/json",
+        headers={"Cache-Control": "max-age=3600"},
+    )
@@ -1,46 +1,78 @@
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+import time
+from itertools import islice
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Query, Request
+import orjson
+from fastapi import APIRouter, Depends, Query, Request, Response
 
 from app.core.ai import enrich_alerts_with_ai
-from app.core.engine import BehavioralAlertEngine, Trade
+from app.core.engine import Alert, BehavioralAlertEngine, Trade
 from app.core.schemas import TradeAnalysisResponse, TradeRequest
 
 router = APIRouter(prefix="/trades", tags=["Trade Analysis"])
 
 
-def get_engine(request: Request):
-    """Dependency — returns the app-level engine singleton from app state."""
-    return request.app.state.engine
+def _alert_default(obj: object) -> object:
+    """orjson fallback so Alert objects serialize without a pre-built list."""
+    if isinstance(obj, Alert):
+        return obj.to_dict()
+    return str(obj)
 
 
-@router.post("/analyze", response_model=TradeAnalysisResponse, summary="Analyse a trade for behavioural biases")
+def _json_response(payload: dict) -> Response:
+    # OPT_PASSTHROUGH_DATACLASS keeps orjson from serializing Alert's raw
+    # fields; the default hook routes it through to_dict for the wire shape.
+    return Response(
+        content=orjson.dumps(
+            payload, default=_alert_default, option=orjson.OPT_PASSTHROUGH_DATACLASS
+        ),
+        media_type="application/json",
+    )
+
+
+def get_engine(request: Request, user_id: str = Query("default")):
+    """Dependency — returns the per-user engine from the app-level registry."""
+    return request.app.state.engines.get(user_id)
+
+
+@router.post(
+    "/analyze",
+    response_model=None,
+    responses={200: {"model": TradeAnalysisResponse}},
+    summary="Analyse a trade for behavioural biases",
+)
 async def analyze_trade(
     req: TradeRequest,
     eng: BehavioralAlertEngine = Depends(get_engine),
-) -> TradeAnalysisResponse:
+) -> Response:
     trade = Trade(
         trade_id=req.trade_id,
         symbol=req.symbol,
         action=req.action,
         quantity=req.quantity,
         price=req.price,
-        timestamp=datetime.utcnow(),
+        timestamp=time.time_ns(),
     )
 
-    alerts = eng.analyze(trade, req.price_before)
+    # The per-user lock keeps one user's trades ordered; to_thread keeps the
+    # CPU-bound analysis off the event loop so other requests' AI enrichment
+    # I/O continues to interleave.
+    async with eng.lock:
+        alerts = await asyncio.to_thread(eng.analyze, trade, req.price_before)
 
     await enrich_alerts_with_ai(alerts)
 
-    return TradeAnalysisResponse(
-        alerts=[a.to_dict() for a in alerts],
-        habit_score=round(eng.habit_score, 1),
-        emotional_index=round(eng.emotional_index, 1),
-        cooldown_recommended=eng.cooldown_recommended,
-        stats=eng.get_stats(),
+    return _json_response(
+        {
+            "alerts": alerts,
+            "habit_score": round(eng.habit_score, 1),
+            "emotional_index": round(eng.emotional_index, 1),
+            "cooldown_recommended": eng.cooldown_recommended,
+            "stats": eng.get_stats(),
+        }
     )
 
 
@@ -53,9 +85,6 @@ def get_stats(eng: BehavioralAlertEngine = Depends(get_engine)) -> dict:
 def get_history(
     limit: Annotated[int, Query(ge=1, le=200)] = 20,
     eng: BehavioralAlertEngine = Depends(get_engine),
-) -> dict:
-    recent = eng.alert_history[-limit:]
-    return {
-        "count": len(recent),
-        "alerts": [a.to_dict() for a in reversed(recent)],
-    }
+) -> Response:
+    recent = list(islice(reversed(eng.alert_history), limit))
+    return _json_response({"count": len(recent), "alerts": recent})
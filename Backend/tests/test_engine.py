@@ -69,8 +69,7 @@ class TestHabitScore:
 
 class TestPredictor:
     def test_predict_returns_expected_keys(self):
-        predictor = Predictor()
-        predictor.load_models() # Should still work even without artifacts
+        predictor = Predictor.instance() # Should still work even without artifacts
         dummy = [0.0] * len(predictor.feature_columns)
         result = predictor.predict(dummy)
         assert "behavior" in result
@@ -79,8 +78,7 @@ class TestPredictor:
         assert "fallback_used" in result
 
     def test_rule_based_revenge_trader(self):
-        predictor = Predictor()
-        predictor.load_models()
+        predictor = Predictor.instance()
         feat = {col: 0.0 for col in predictor.feature_columns}
         feat["max_loss_streak"] = 5.0
         feat["trades_after_loss_ratio"] = 0.8